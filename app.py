@@ -4,24 +4,69 @@ Database: SQLite
 Authentication: JWT Tokens
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_request_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 import jwt
 import os
+import sqlite3
+import threading
+import time
 from functools import wraps
 import json
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quizmaster.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('QUIZMASTER_DATABASE_URI', 'sqlite:///quizmaster.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Optional read-only bind for GET endpoints, e.g. a replica URI or a read-only
+# connection to the same SQLite file: sqlite:///file:quizmaster.db?mode=ro&uri=true
+READ_DATABASE_URI = os.environ.get('QUIZMASTER_READ_DATABASE_URI')
+if READ_DATABASE_URI:
+    app.config['SQLALCHEMY_BINDS'] = {'replica': READ_DATABASE_URI}
+
+# Seconds after a write during which that user's reads stay on the primary
+app.config['READ_YOUR_WRITES_WINDOW'] = 10
+
+# Admission control: requests beyond these limits queue, then get a 503
+app.config['ADMISSION_MAX_CONCURRENT'] = 16
+app.config['ADMISSION_CLASSES'] = {
+    # priority: lower wins; share: fraction of slots the class may fill;
+    # max_queued: waiting requests before shedding; deadline: seconds per request
+    'critical': {'priority': 0, 'share': 1.0, 'max_queued': 64, 'deadline': 10, 'retry_after': 1},
+    'normal': {'priority': 1, 'share': 0.75, 'max_queued': 32, 'deadline': 5, 'retry_after': 2},
+    'low': {'priority': 2, 'share': 0.5, 'max_queued': 8, 'deadline': 3, 'retry_after': 5},
+}
+app.config['ADMISSION_ENDPOINT_LIMITS'] = {
+    'get_leaderboard': 2,
+    'signup': 4,
+    'login': 4,
+}
+
+
+class RoutingSession(Session):
+    """Session that sends reads of replica-routed requests to the read-only bind."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_request_context()
+            and g.get('use_read_replica')
+            and 'replica' in self._db.engines
+        ):
+            return self._db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
 # Initialize extensions
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 CORS(app, resources={r"/api/*": {"origins": "*", "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]}}, supports_credentials=False)
 
 # ============================================
@@ -172,6 +217,7 @@ def token_required(f):
             current_user = User.query.get(data['user_id'])
             if not current_user:
                 return jsonify({'message': 'User not found!'}), 404
+            g.current_user = current_user
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token has expired!'}), 401
         except jwt.InvalidTokenError:
@@ -189,11 +235,241 @@ def generate_token(user_id):
     return jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
 
 
+# ============================================
+# READ/WRITE SESSION ROUTING
+# ============================================
+
+# user_id -> time of that user's last write (per process)
+_recent_writes = {}
+_recent_writes_lock = threading.Lock()
+# Size at which mark_recent_write next drops entries whose window has closed
+_recent_writes_sweep_at = 1024
+
+
+def set_sqlite_wal(dbapi_connection, connection_record):
+    # WAL lets readers keep going while a write is in progress
+    try:
+        dbapi_connection.execute('PRAGMA journal_mode=WAL')
+    except sqlite3.OperationalError:
+        pass  # read-only connections cannot change the journal mode
+
+
+with app.app_context():
+    for engine in db.engines.values():
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', set_sqlite_wal)
+
+
+def mark_recent_write(user_id):
+    global _recent_writes_sweep_at
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[user_id] = now
+        if len(_recent_writes) >= _recent_writes_sweep_at:
+            window = app.config['READ_YOUR_WRITES_WINDOW']
+            for stale in [uid for uid, t in _recent_writes.items() if now - t > window]:
+                del _recent_writes[stale]
+            # Doubling keeps the sweep cheap when most entries are still live
+            _recent_writes_sweep_at = max(1024, 2 * len(_recent_writes))
+
+
+def has_recent_write(user_id):
+    written_at = _recent_writes.get(user_id)
+    if written_at is None:
+        return False
+    if time.monotonic() - written_at > app.config['READ_YOUR_WRITES_WINDOW']:
+        with _recent_writes_lock:
+            _recent_writes.pop(user_id, None)
+        return False
+    return True
+
+
+def request_user_id():
+    """Id of the authenticated user, also for routes without token_required."""
+    current_user = g.get('current_user')
+    if current_user is not None:
+        return current_user.id
+
+    token = request.headers.get('Authorization')
+    if not token:
+        return None
+    if token.startswith('Bearer '):
+        token = token[7:]
+    try:
+        return jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])['user_id']
+    except (jwt.InvalidTokenError, KeyError):
+        return None
+
+
+def read_replica(f):
+    """Route the endpoint's queries to the read-only bind when one is configured.
+
+    Users who wrote within READ_YOUR_WRITES_WINDOW keep reading from the primary
+    so they always see their own changes. On public routes this only works when
+    the client sends its bearer token; anonymous requests always use the replica.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        user_id = request_user_id()
+        g.use_read_replica = user_id is None or not has_recent_write(user_id)
+        return f(*args, **kwargs)
+    return decorated
+
+
+# ============================================
+# ADMISSION CONTROL
+# ============================================
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class AdmissionController:
+    """Limits concurrent requests, admitting waiters in priority order."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._endpoint_in_flight = {}
+        self._waiting = []  # (priority, seq, endpoint, class_name), sorted
+        self._seq = 0
+        self._counters = {}
+
+    def _count(self, class_name, key):
+        counters = self._counters.setdefault(
+            class_name, {'admitted': 0, 'shed': 0, 'expired': 0, 'cancelled': 0}
+        )
+        counters[key] += 1
+
+    def _can_run(self, endpoint, class_name):
+        config = app.config['ADMISSION_CLASSES'][class_name]
+        slots = max(1, int(app.config['ADMISSION_MAX_CONCURRENT'] * config['share']))
+        endpoint_limit = app.config['ADMISSION_ENDPOINT_LIMITS'].get(endpoint)
+        if self._in_flight >= slots:
+            return False
+        if endpoint_limit is not None and self._endpoint_in_flight.get(endpoint, 0) >= endpoint_limit:
+            return False
+        return True
+
+    def acquire(self, endpoint, class_name, deadline):
+        """Wait for a slot until the deadline. Returns False if the request was shed."""
+        config = app.config['ADMISSION_CLASSES'][class_name]
+        with self._cond:
+            queued = sum(1 for entry in self._waiting if entry[3] == class_name)
+            if queued >= config['max_queued']:
+                self._count(class_name, 'shed')
+                return False
+
+            self._seq += 1
+            entry = (config['priority'], self._seq, endpoint, class_name)
+            self._waiting.append(entry)
+            self._waiting.sort()
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(entry)
+                    self._count(class_name, 'expired')
+                    self._cond.notify_all()
+                    return False
+                # Admit only if no better-placed waiter could run instead
+                runnable = next(
+                    (e for e in self._waiting if self._can_run(e[2], e[3])), None
+                )
+                if runnable is entry:
+                    break
+                self._cond.wait(remaining)
+
+            self._waiting.remove(entry)
+            self._in_flight += 1
+            self._endpoint_in_flight[endpoint] = self._endpoint_in_flight.get(endpoint, 0) + 1
+            self._count(class_name, 'admitted')
+            # Waiters that slept while this one was ahead may be runnable now
+            self._cond.notify_all()
+            return True
+
+    def release(self, endpoint):
+        with self._cond:
+            self._in_flight -= 1
+            self._endpoint_in_flight[endpoint] -= 1
+            self._cond.notify_all()
+
+    def record_cancelled(self, class_name):
+        with self._cond:
+            self._count(class_name, 'cancelled')
+
+    def stats(self):
+        with self._cond:
+            classes = {}
+            for class_name in app.config['ADMISSION_CLASSES']:
+                counters = self._counters.get(
+                    class_name, {'admitted': 0, 'shed': 0, 'expired': 0, 'cancelled': 0}
+                )
+                classes[class_name] = dict(
+                    counters,
+                    queued=sum(1 for entry in self._waiting if entry[3] == class_name)
+                )
+            return {
+                'in_flight': self._in_flight,
+                'max_concurrent': app.config['ADMISSION_MAX_CONCURRENT'],
+                'endpoints_in_flight': {k: v for k, v in self._endpoint_in_flight.items() if v},
+                'classes': classes
+            }
+
+
+admission = AdmissionController()
+
+
+def check_deadline():
+    """Abort the current request if its deadline has passed."""
+    deadline = g.get('deadline')
+    if deadline is not None and time.monotonic() > deadline:
+        raise DeadlineExceeded('Request deadline exceeded')
+
+
+def admission_control(class_name):
+    """Queue the request behind higher-priority work and shed it with a 503 when
+    the queue is full or its deadline passes before it gets a slot.
+
+    Clients may ask for a shorter deadline with an X-Request-Timeout header (seconds).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            config = app.config['ADMISSION_CLASSES'][class_name]
+            timeout = config['deadline']
+            try:
+                timeout = min(timeout, float(request.headers.get('X-Request-Timeout', timeout)))
+            except ValueError:
+                pass
+            g.deadline = time.monotonic() + timeout
+
+            retry_after = {'Retry-After': str(config['retry_after'])}
+            if not admission.acquire(f.__name__, class_name, g.deadline):
+                return jsonify({'message': 'Server busy, please retry'}), 503, retry_after
+
+            try:
+                return f(*args, **kwargs)
+            except DeadlineExceeded:
+                admission.record_cancelled(class_name)
+                return jsonify({'message': 'Request deadline exceeded'}), 503, retry_after
+            finally:
+                admission.release(f.__name__)
+        return decorated
+    return decorator
+
+
+@app.route('/api/admission', methods=['GET'])
+def get_admission_stats():
+    return jsonify(admission.stats()), 200
+
+
 # ============================================
 # API ROUTES - AUTHENTICATION
 # ============================================
 
 @app.route('/api/auth/signup', methods=['POST'])
+@admission_control('low')
 def signup():
     try:
         data = request.get_json()
@@ -207,11 +483,13 @@ def signup():
         if len(data['password']) < 6:
             return jsonify({'message': 'Password must be at least 6 characters'}), 400
         
+        check_deadline()
         user = User(name=data['name'], email=data['email'])
         user.set_password(data['password'])
         
         db.session.add(user)
         db.session.commit()
+        mark_recent_write(user.id)
         
         token = generate_token(user.id)
         
@@ -220,12 +498,15 @@ def signup():
             'token': token,
             'user': user.to_dict()
         }), 201
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': str(e)}), 500
 
 
 @app.route('/api/auth/login', methods=['POST'])
+@admission_control('normal')
 def login():
     try:
         data = request.get_json()
@@ -235,6 +516,7 @@ def login():
         
         user = User.query.filter_by(email=data['email']).first()
         
+        check_deadline()
         if not user or not user.check_password(data['password']):
             return jsonify({'message': 'Invalid email or password'}), 401
         
@@ -245,11 +527,14 @@ def login():
             'token': token,
             'user': user.to_dict()
         }), 200
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
 
 @app.route('/api/auth/me', methods=['GET'])
+@admission_control('normal')
 @token_required
 def get_current_user(current_user):
     return jsonify(current_user.to_dict()), 200
@@ -260,6 +545,8 @@ def get_current_user(current_user):
 # ============================================
 
 @app.route('/api/quizzes', methods=['GET'])
+@admission_control('normal')
+@read_replica
 def get_all_quizzes():
     try:
         quizzes = Quiz.query.all()
@@ -271,6 +558,8 @@ def get_all_quizzes():
 
 
 @app.route('/api/quizzes/<int:quiz_id>', methods=['GET'])
+@admission_control('normal')
+@read_replica
 def get_quiz(quiz_id):
     try:
         quiz = Quiz.query.get(quiz_id)
@@ -283,6 +572,7 @@ def get_quiz(quiz_id):
 
 
 @app.route('/api/quizzes', methods=['POST'])
+@admission_control('normal')
 @token_required
 def create_quiz(current_user):
     # Only admin can create quizzes (simplified)
@@ -306,6 +596,7 @@ def create_quiz(current_user):
         
         db.session.add(quiz)
         db.session.commit()
+        mark_recent_write(current_user.id)
         
         return jsonify({
             'message': 'Quiz created successfully',
@@ -321,6 +612,7 @@ def create_quiz(current_user):
 # ============================================
 
 @app.route('/api/quizzes/<int:quiz_id>/submit', methods=['POST'])
+@admission_control('critical')
 @token_required
 def submit_quiz(current_user, quiz_id):
     try:
@@ -358,6 +650,7 @@ def submit_quiz(current_user, quiz_id):
         
         db.session.add(result)
         db.session.commit()
+        mark_recent_write(current_user.id)
         
         return jsonify({
             'message': 'Quiz submitted successfully',
@@ -369,7 +662,9 @@ def submit_quiz(current_user, quiz_id):
 
 
 @app.route('/api/results', methods=['GET'])
+@admission_control('normal')
 @token_required
+@read_replica
 def get_user_results(current_user):
     try:
         results = QuizResult.query.filter_by(user_id=current_user.id).order_by(
@@ -384,6 +679,7 @@ def get_user_results(current_user):
 
 
 @app.route('/api/results/<int:result_id>', methods=['GET'])
+@admission_control('normal')
 @token_required
 def get_result(current_user, result_id):
     try:
@@ -411,7 +707,9 @@ def get_result(current_user, result_id):
 # ============================================
 
 @app.route('/api/dashboard', methods=['GET'])
+@admission_control('normal')
 @token_required
+@read_replica
 def get_dashboard(current_user):
     try:
         stats = current_user.get_stats()
@@ -429,6 +727,8 @@ def get_dashboard(current_user):
 
 
 @app.route('/api/leaderboard', methods=['GET'])
+@admission_control('low')
+@read_replica
 def get_leaderboard():
     try:
         # Get top users by average score
@@ -436,6 +736,7 @@ def get_leaderboard():
         leaderboard = []
         
         for user in users:
+            check_deadline()
             stats = user.get_stats()
             if stats['total_quizzes'] > 0:
                 leaderboard.append({
@@ -452,6 +753,8 @@ def get_leaderboard():
         return jsonify({
             'leaderboard': leaderboard[:20]  # Top 20
         }), 200
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -461,12 +764,14 @@ def get_leaderboard():
 # ============================================
 
 @app.route('/api/profile', methods=['GET'])
+@admission_control('normal')
 @token_required
 def get_profile(current_user):
     return jsonify(current_user.to_dict()), 200
 
 
 @app.route('/api/profile', methods=['PUT'])
+@admission_control('normal')
 @token_required
 def update_profile(current_user):
     try:
@@ -482,6 +787,7 @@ def update_profile(current_user):
         
         current_user.updated_at = datetime.utcnow()
         db.session.commit()
+        mark_recent_write(current_user.id)
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Keep the test database out of the app's instance folder
+os.environ.setdefault(
+    'QUIZMASTER_DATABASE_URI',
+    'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'quizmaster.db')
+)
@@ -493,7 +493,9 @@ function loadResultsTable(results) {
 
 async function loadLeaderboard() {
     try {
-        const response = await fetch(`${API_URL}/leaderboard`);
+        // Send the token when logged in so the backend can show the user's latest result
+        const headers = authToken ? { 'Authorization': `Bearer ${authToken}` } : {};
+        const response = await fetch(`${API_URL}/leaderboard`, { headers });
         const data = await response.json();
         
         const tbody = document.getElementById('leaderboardBody');
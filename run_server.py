@@ -1,13 +1,38 @@
 """
 Simple HTTP Server to serve the Quiz Website
 Run this in the quiz-websites directory
+
+Usage:
+    python run_server.py               # threaded server with precompressed, cached assets
+    python run_server.py --simple      # original single-threaded SimpleHTTPRequestHandler
+    python run_server.py --benchmark   # compare throughput of both modes
 """
 
+import gzip
+import hashlib
+import mimetypes
 import os
+import re
+import shutil
 import sys
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import time
+from email.utils import formatdate
+from http.server import HTTPServer, ThreadingHTTPServer, SimpleHTTPRequestHandler
 import webbrowser
-from threading import Timer
+from threading import Thread, Timer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(ROOT_DIR, '.static_cache')
+ASSET_EXTENSIONS = ('.html', '.css', '.js')
+HASHED_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'no-cache'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
 
 class MyHTTPRequestHandler(SimpleHTTPRequestHandler):
     def end_headers(self):
@@ -16,38 +41,354 @@ class MyHTTPRequestHandler(SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
-    
+
     def do_OPTIONS(self):
         self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+# ============================================
+# PRECOMPRESSED ASSETS
+# ============================================
+
+def build_assets(root=ROOT_DIR, cache_dir=CACHE_DIR):
+    """Write hashed, gzip and brotli copies of the site's assets into cache_dir.
+
+    Returns a dict mapping URL path -> asset info. Each asset is reachable by
+    its original name (revalidated on every load) and by its content-hashed
+    name (cached for a year). index.html is rewritten to use the hashed names.
+    """
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+    os.makedirs(cache_dir)
+
+    names = sorted(
+        name for name in os.listdir(root)
+        if name.endswith(ASSET_EXTENSIONS) and os.path.isfile(os.path.join(root, name))
+    )
+
+    # Hash everything except HTML first so pages can reference the hashed names
+    hashed_names = {}
+    contents = {}
+    for name in names:
+        with open(os.path.join(root, name), 'rb') as f:
+            contents[name] = f.read()
+        if not name.endswith('.html'):
+            hashed_names[name] = _hashed_name(name, contents[name])
+
+    def rewrite(match):
+        return '%s="%s"' % (match.group(1), hashed_names.get(match.group(2), match.group(2)))
+
+    assets = {}
+    for name in names:
+        data = contents[name]
+        if name.endswith('.html'):
+            data = re.sub(r'(href|src)="([^"]+)"', rewrite, data.decode('utf-8')).encode('utf-8')
+        mtime = os.path.getmtime(os.path.join(root, name))
+        asset = _write_variants(name, data, mtime, cache_dir)
+        assets['/' + name] = dict(asset, cache_control=DEFAULT_CACHE_CONTROL)
+        if name in hashed_names:
+            assets['/' + hashed_names[name]] = dict(asset, cache_control=HASHED_CACHE_CONTROL)
+
+    assets['/'] = assets.get('/index.html')
+    return {path: asset for path, asset in assets.items() if asset}
+
+
+def _hashed_name(name, data):
+    base, ext = os.path.splitext(name)
+    return '%s.%s%s' % (base, hashlib.sha256(data).hexdigest()[:10], ext)
+
+
+def _write_variants(name, data, mtime, cache_dir):
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    path = os.path.join(cache_dir, name)
+    variants = {'identity': path}
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    variants['gzip'] = path + '.gz'
+
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+        variants['br'] = path + '.br'
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type.endswith('javascript'):
+        content_type += '; charset=utf-8'
+
+    return {
+        'digest': digest,
+        'content_type': content_type,
+        'last_modified': formatdate(mtime, usegmt=True),
+        'variants': variants,
+    }
+
+
+class StaticAssetHandler(MyHTTPRequestHandler):
+    """Serves precompressed assets with ETag, Range and sendfile support.
+
+    Anything not in the asset table falls back to SimpleHTTPRequestHandler.
+    """
+    protocol_version = 'HTTP/1.1'
+    # Headers and the sendfile body go out as separate writes; don't let Nagle hold them
+    disable_nagle_algorithm = True
+    assets = {}
+
+    def do_GET(self):
+        if not self.send_asset(head=False):
+            super().do_GET()
+
+    def do_HEAD(self):
+        if not self.send_asset(head=True):
+            super().do_HEAD()
+
+    def send_asset(self, head):
+        asset = self.assets.get(self.path.split('?', 1)[0])
+        if asset is None:
+            return False
+
+        # Only single byte ranges are supported; anything else gets the full body
+        range_match = RANGE_RE.match(self.headers.get('Range', '').strip())
+        if range_match and not any(range_match.groups()):
+            range_match = None
+        # Ranges always refer to the uncompressed representation
+        encoding = 'identity' if range_match else self.choose_encoding(asset)
+        path = asset['variants'][encoding]
+        size = os.path.getsize(path)
+        etag = '"%s-%s"' % (asset['digest'], encoding)
+
+        if _etag_matches(self.headers.get('If-None-Match', ''), etag):
+            self.send_response(304)
+            self.send_asset_headers(asset, etag, encoding)
+            self.end_headers()
+            return True
+
+        start, end = 0, size - 1
+        status = 200
+        if range_match:
+            byte_range = _parse_range(range_match, size)
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header('Content-Range', 'bytes */%d' % size)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return True
+            start, end = byte_range
+            status = 206
+
+        length = end - start + 1
+        self.send_response(status)
+        self.send_asset_headers(asset, etag, encoding)
+        self.send_header('Content-Length', str(length))
+        if status == 206:
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, end, size))
         self.end_headers()
 
-def start_server():
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    
-    server = HTTPServer(('127.0.0.1', 8000), MyHTTPRequestHandler)
+        if not head:
+            with open(path, 'rb') as f:
+                self.send_file(f, start, length)
+        return True
+
+    def send_asset_headers(self, asset, etag, encoding):
+        self.send_header('Content-Type', asset['content_type'])
+        self.send_header('Cache-Control', asset['cache_control'])
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', asset['last_modified'])
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+
+    def choose_encoding(self, asset):
+        accepted = _parse_accept_encoding(self.headers.get('Accept-Encoding', ''))
+        for encoding in ('br', 'gzip'):
+            if encoding in asset['variants'] and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding
+        return 'identity'
+
+    def send_file(self, f, offset, count):
+        self.wfile.flush()
+        try:
+            out_fd = self.connection.fileno()
+            while count > 0:
+                sent = os.sendfile(out_fd, f.fileno(), offset, count)
+                if sent == 0:
+                    break
+                offset += sent
+                count -= sent
+        except (AttributeError, OSError):
+            # No sendfile on this platform (e.g. Windows) - copy through userspace
+            f.seek(offset)
+            while count > 0:
+                chunk = f.read(min(count, 64 * 1024))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                count -= len(chunk)
+
+
+def _parse_accept_encoding(header):
+    """Map each coding in an Accept-Encoding header to its q value."""
+    accepted = {}
+    for token in header.split(','):
+        coding, _, params = token.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _etag_matches(header, etag):
+    """Weak If-None-Match comparison, including the '*' wildcard."""
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _parse_range(match, size):
+    """Return (start, end) for a matched single byte range, or None if unsatisfiable."""
+    if size == 0:
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            return None
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+# ============================================
+# SERVER
+# ============================================
+
+def make_server(simple=False, host='127.0.0.1', port=8000):
+    if simple:
+        return HTTPServer((host, port), MyHTTPRequestHandler)
+    StaticAssetHandler.assets = build_assets()
+    return ThreadingHTTPServer((host, port), StaticAssetHandler)
+
+
+def start_server(simple=False):
+    os.chdir(ROOT_DIR)
+
+    server = make_server(simple=simple)
     print("=" * 60)
     print("QuizMaster Website Server")
     print("=" * 60)
     print(f"✓ Website running on: http://127.0.0.1:8000")
     print(f"✓ Backend running on: http://127.0.0.1:5000")
+    print(f"✓ Mode: {'simple' if simple else 'threaded, precompressed'}")
     print(f"✓ Opening website in browser...")
     print("=" * 60)
     print("Press CTRL+C to stop the server")
     print("=" * 60)
-    
+
     # Open browser after a short delay
     def open_browser():
         webbrowser.open('http://127.0.0.1:8000')
-    
+
     timer = Timer(1, open_browser)
     timer.daemon = True
     timer.start()
-    
+
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\nServer stopped.")
         sys.exit(0)
 
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def benchmark(clients=16, requests_per_client=50, stall=1.0):
+    """Fetch the site's assets concurrently from both server modes and print throughput.
+
+    Each mode is measured twice: with fast clients only, and with one extra
+    client that sends half a request and stalls for `stall` seconds, like a
+    phone on a bad connection.
+    """
+    import http.client
+    import socket
+
+    os.chdir(ROOT_DIR)
+    paths = ['/index.html', '/main.css', '/main.js', '/main_new.js',
+             '/frontend.js', '/threejs-animation.js']
+    headers = {'Accept-Encoding': 'gzip, br'}
+
+    def run_client(port, totals):
+        # Each client makes a fresh connection per request, like a cold browser
+        for i in range(requests_per_client):
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            conn.request('GET', paths[i % len(paths)], headers=headers)
+            totals.append(len(conn.getresponse().read()))
+            conn.close()
+
+    def run_slow_client(port):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'GET /main.css HTTP/1.1\r\n')
+        time.sleep(stall)
+        sock.sendall(b'Host: 127.0.0.1\r\nConnection: close\r\n\r\n')
+        while sock.recv(64 * 1024):
+            pass
+        sock.close()
+
+    print("%-10s %-12s %10s %12s %12s" % ('mode', 'clients', 'req/s', 'MB sent', 'seconds'))
+    for simple in (True, False):
+        for slow in (False, True):
+            server = make_server(simple=simple, port=0)
+            server.RequestHandlerClass.log_message = lambda *args: None
+            Thread(target=server.serve_forever, daemon=True).start()
+            port = server.server_address[1]
+
+            threads = []
+            if slow:
+                threads.append(Thread(target=run_slow_client, args=(port,)))
+            totals = []
+            threads += [Thread(target=run_client, args=(port, totals)) for _ in range(clients)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+                if slow and t is threads[0]:
+                    time.sleep(0.05)  # let the slow client connect first
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+
+            server.shutdown()
+            server.server_close()
+            print("%-10s %-12s %10.0f %12.2f %12.2f" % (
+                'simple' if simple else 'optimized', '+1 stalled' if slow else 'fast',
+                len(totals) / elapsed, sum(totals) / 1e6, elapsed))
+
+
 if __name__ == '__main__':
-    start_server()
+    if '--benchmark' in sys.argv:
+        benchmark()
+    else:
+        start_server(simple='--simple' in sys.argv)
@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from app import app, admission, init_db, db, User, AdmissionController
+
+
+@pytest.fixture
+def client():
+    init_db()
+    return app.test_client()
+
+
+def auth_header(client):
+    token = client.post(
+        '/api/auth/login', json={'email': 'demo@example.com', 'password': 'demo123'}
+    ).json['token']
+    return {'Authorization': 'Bearer ' + token}
+
+
+def wait_until_queued(class_name, count):
+    while admission.stats()['classes'][class_name]['queued'] < count:
+        time.sleep(0.001)
+
+
+def test_freed_slots_wake_every_waiter(monkeypatch):
+    """Admitting one waiter must not leave the others asleep while slots are free."""
+    monkeypatch.setitem(app.config, 'ADMISSION_MAX_CONCURRENT', 4)
+
+    for _ in range(50):
+        admission = AdmissionController()
+        deadline = time.monotonic() + 5
+        for i in range(4):
+            assert admission.acquire('held', 'critical', deadline)
+
+        results = []
+        waiters = [
+            threading.Thread(
+                target=lambda: results.append(
+                    admission.acquire('submit_quiz', 'critical', time.monotonic() + 0.5)
+                )
+            )
+            for _ in range(4)
+        ]
+        for t in waiters:
+            t.start()
+        while admission.stats()['classes']['critical']['queued'] < 4:
+            time.sleep(0.001)
+
+        for _ in range(4):
+            admission.release('held')
+        for t in waiters:
+            t.join()
+
+        assert results == [True] * 4
+        assert admission.stats()['classes']['critical']['expired'] == 0
+
+
+def test_expired_deadline_is_not_admitted():
+    admission = AdmissionController()
+    assert not admission.acquire('submit_quiz', 'critical', time.monotonic() - 1)
+    assert admission.stats()['in_flight'] == 0
+
+
+def test_full_queue_is_shed_with_retry_after(client, monkeypatch):
+    monkeypatch.setitem(app.config['ADMISSION_CLASSES']['low'], 'max_queued', 0)
+    shed = admission.stats()['classes']['low']['shed']
+
+    response = client.get('/api/leaderboard')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert admission.stats()['classes']['low']['shed'] == shed + 1
+
+
+def test_expired_timeout_header_is_rejected(client):
+    response = client.get('/api/quizzes', headers={'X-Request-Timeout': '0'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
+
+
+def test_deadline_inside_handler_is_cancelled(client, monkeypatch):
+    with app.app_context():
+        if User.query.filter_by(email='slow@example.com').first() is None:
+            user = User(name='Slow User', email='slow@example.com')
+            user.set_password('secret1')
+            db.session.add(user)
+            db.session.commit()
+
+    get_stats = User.get_stats
+
+    def slow_get_stats(self):
+        time.sleep(0.2)
+        return get_stats(self)
+
+    monkeypatch.setattr(User, 'get_stats', slow_get_stats)
+    cancelled = admission.stats()['classes']['low']['cancelled']
+
+    # The scan checks the deadline before each user, so the second check fails
+    response = client.get('/api/leaderboard', headers={'X-Request-Timeout': '0.1'})
+
+    assert response.status_code == 503
+    assert response.json['message'] == 'Request deadline exceeded'
+    assert response.headers['Retry-After'] == '5'
+    assert admission.stats()['classes']['low']['cancelled'] == cancelled + 1
+
+
+def test_critical_request_is_admitted_before_low(client, monkeypatch):
+    headers = auth_header(client)
+    monkeypatch.setitem(app.config, 'ADMISSION_MAX_CONCURRENT', 1)
+    assert admission.acquire('held', 'critical', time.monotonic() + 5)
+
+    finished = []
+
+    def leaderboard():
+        app.test_client().get('/api/leaderboard')
+        finished.append('leaderboard')
+
+    def submit():
+        app.test_client().post('/api/quizzes/1/submit', json={'answers': [1]}, headers=headers)
+        finished.append('submit_quiz')
+
+    low = threading.Thread(target=leaderboard)
+    low.start()
+    wait_until_queued('low', 1)
+    critical = threading.Thread(target=submit)
+    critical.start()
+    wait_until_queued('critical', 1)
+
+    # Only one slot: whichever is admitted first also finishes first
+    admission.release('held')
+    low.join()
+    critical.join()
+
+    assert finished == ['submit_quiz', 'leaderboard']
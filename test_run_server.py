@@ -0,0 +1,89 @@
+import http.client
+import os
+import threading
+
+import pytest
+
+import run_server
+
+
+@pytest.fixture(scope='module')
+def port():
+    server = run_server.make_server(port=0)
+    server.RequestHandlerClass.log_message = lambda *args: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def get(port, path, **headers):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('GET', path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def read_asset(name):
+    with open(os.path.join(run_server.ROOT_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def test_content_types(port):
+    response, _ = get(port, '/')
+    assert response.status == 200
+    assert response.getheader('Content-Type') == 'text/html; charset=utf-8'
+
+    response, body = get(port, '/main.css')
+    assert response.status == 200
+    assert response.getheader('Content-Type') == 'text/css; charset=utf-8'
+    assert body == read_asset('main.css')
+
+    response, _ = get(port, '/main_new.js')
+    assert 'javascript' in response.getheader('Content-Type')
+
+
+def test_if_none_match(port):
+    response, _ = get(port, '/main.css')
+    etag = response.getheader('ETag')
+
+    for header in (etag, 'W/' + etag, '"other", ' + etag, '*'):
+        response, body = get(port, '/main.css', **{'If-None-Match': header})
+        assert response.status == 304
+        assert body == b''
+
+    response, _ = get(port, '/main.css', **{'If-None-Match': '"other"'})
+    assert response.status == 200
+
+
+def test_ranges(port):
+    css = read_asset('main.css')
+
+    response, body = get(port, '/main.css', Range='bytes=10-19')
+    assert response.status == 206
+    assert response.getheader('Content-Range') == 'bytes 10-19/%d' % len(css)
+    assert body == css[10:20]
+
+    response, body = get(port, '/main.css', Range='bytes=-5')
+    assert response.status == 206
+    assert body == css[-5:]
+
+    response, _ = get(port, '/main.css', Range='bytes=%d-' % len(css))
+    assert response.status == 416
+
+    # Multiple ranges are not supported, so the whole file is sent
+    response, body = get(port, '/main.css', Range='bytes=0-1,5-6')
+    assert response.status == 200
+    assert body == css
+
+
+def test_accept_encoding(port):
+    response, _ = get(port, '/main.css', **{'Accept-Encoding': 'gzip'})
+    assert response.getheader('Content-Encoding') == 'gzip'
+
+    for header in ('gzip;q=0', 'gzip;q=0.0', 'gzip; q=0.000, identity'):
+        response, body = get(port, '/main.css', **{'Accept-Encoding': header})
+        assert response.getheader('Content-Encoding') is None
+        assert body == read_asset('main.css')